@@ -157,24 +157,37 @@ def resize(img, height, width, interpolation=cv2.INTER_LINEAR):
     return img
 
 
-@preserve_channel_dim
-def shift_scale_rotate(img, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, border_mode=cv2.BORDER_REFLECT_101,
-                       value=None):
-    height, width = img.shape[:2]
+def get_shift_scale_rotate_matrix(angle, scale, dx, dy, rows, cols):
+    """Return the 2x3 matrix that rotates and scales an image around its center and then shifts it."""
+    height, width = rows, cols
     center = (width / 2, height / 2)
     matrix = cv2.getRotationMatrix2D(center, angle, scale)
     matrix[0, 2] += dx * width
     matrix[1, 2] += dy * height
+    return matrix
+
+
+@preserve_channel_dim
+def shift_scale_rotate(img, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, border_mode=cv2.BORDER_REFLECT_101,
+                       value=None):
+    height, width = img.shape[:2]
+    matrix = get_shift_scale_rotate_matrix(angle, scale, dx, dy, height, width)
     img = cv2.warpAffine(img, matrix, (width, height), flags=interpolation, borderMode=border_mode, borderValue=value)
     return img
 
 
+@preserve_channel_dim
+def warp_affine(img, matrix, interpolation=cv2.INTER_LINEAR, border_mode=cv2.BORDER_REFLECT_101, value=None):
+    """Warp an image by a 2x3 or 3x3 affine matrix, keeping the size of the image."""
+    height, width = img.shape[:2]
+    img = cv2.warpAffine(img, matrix[:2], (width, height), flags=interpolation, borderMode=border_mode,
+                         borderValue=value)
+    return img
+
+
 def bbox_shift_scale_rotate(bbox, angle, scale, dx, dy, interpolation, rows, cols, **params):
     height, width = rows, cols
-    center = (width / 2, height / 2)
-    matrix = cv2.getRotationMatrix2D(center, angle, scale)
-    matrix[0, 2] += dx * width
-    matrix[1, 2] += dy * height
+    matrix = get_shift_scale_rotate_matrix(angle, scale, dx, dy, rows, cols)
     x = np.array([bbox[0], bbox[2], bbox[2], bbox[0]])
     y = np.array([bbox[1], bbox[1], bbox[3], bbox[3]])
     ones = np.ones(shape=(len(x)))
@@ -187,17 +200,69 @@ def bbox_shift_scale_rotate(bbox, angle, scale, dx, dy, interpolation, rows, col
     return [min(tr_points[:, 0]), min(tr_points[:, 1]), max(tr_points[:, 0]), max(tr_points[:, 1])]
 
 
+def bboxes_shift_scale_rotate(bboxes, angle, scale, dx, dy, interpolation, rows, cols, **params):
+    """Vectorized version of :func:`bbox_shift_scale_rotate` for an array of bounding boxes with shape (N, 4)."""
+    matrix = get_shift_scale_rotate_matrix(angle, scale, dx, dy, rows, cols)
+    return bboxes_affine(bboxes, matrix, rows, cols)
+
+
+def bboxes_affine(bboxes, matrix, rows, cols):
+    """Transform an array of bounding boxes with shape (N, 4) by an affine matrix.
+
+    Args:
+        bboxes (numpy.ndarray): Normalized bounding boxes with shape (N, 4).
+        matrix (numpy.ndarray): 2x3 or 3x3 affine matrix that works with pixel coordinates.
+        rows (int): Image rows.
+        cols (int): Image cols.
+
+    Returns:
+        numpy.ndarray: Normalized boxes that enclose the transformed corners of every input box.
+    """
+    # Corner coordinates are kept as separate (N, 4) arrays of x and y, so the matrix is applied with plain
+    # elementwise operations instead of a matmul over N tiny stacked matrices
+    x = bboxes[:, [0, 2, 2, 0]] * cols
+    y = bboxes[:, [1, 1, 3, 3]] * rows
+    tr_x = (matrix[0, 0] * x + matrix[0, 1] * y + matrix[0, 2]) / cols
+    tr_y = (matrix[1, 0] * x + matrix[1, 1] * y + matrix[1, 2]) / rows
+    return np.stack([tr_x.min(axis=1), tr_y.min(axis=1), tr_x.max(axis=1), tr_y.max(axis=1)], axis=1)
+
+
 def keypoint_shift_scale_rotate(keypoint, angle, scale, dx, dy, rows, cols, **params):
-    height, width = rows, cols
-    center = (width / 2, height / 2)
     x, y, a, s = keypoint
-    matrix = cv2.getRotationMatrix2D(center, angle, scale)
-    matrix[0, 2] += dx * width
-    matrix[1, 2] += dy * height
+    matrix = get_shift_scale_rotate_matrix(angle, scale, dx, dy, rows, cols)
     x, y = cv2.transform(np.array([[[x, y]]]), matrix).squeeze()
     return [x, y, a + math.radians(angle), s * scale]
 
 
+def keypoints_shift_scale_rotate(keypoints, angle, scale, dx, dy, rows, cols, **params):
+    """Vectorized version of :func:`keypoint_shift_scale_rotate` for an array of keypoints with shape (N, 4)."""
+    matrix = get_shift_scale_rotate_matrix(angle, scale, dx, dy, rows, cols)
+    keypoints = keypoints_affine(keypoints, matrix)
+    return keypoints * [1, 1, 1, scale] + [0, 0, math.radians(angle), 0]
+
+
+def keypoints_affine(keypoints, matrix):
+    """Move the coordinates of an array of keypoints with shape (N, 4) by a 2x3 or 3x3 affine matrix.
+
+    Angles and scales are left untouched.
+    """
+    keypoints = keypoints.copy()
+    keypoints[:, :2] = np.matmul(keypoints[:, :2], matrix[:2, :2].T) + matrix[:2, 2]
+    return keypoints
+
+
+def keypoints_similarity(keypoints, matrix):
+    """Transform an array of keypoints with shape (N, 4) by a similarity matrix.
+
+    The matrix may only combine a rotation, an uniform scale and a shift. Keypoint angles are rotated and scales
+    are multiplied accordingly.
+    """
+    angle = math.atan2(matrix[0, 1], matrix[0, 0])
+    scale = math.hypot(matrix[0, 0], matrix[0, 1])
+    keypoints = keypoints_affine(keypoints, matrix)
+    return keypoints * [1, 1, 1, scale] + [0, 0, angle, 0]
+
+
 def crop(img, x_min, y_min, x_max, y_max):
     height, width = img.shape[:2]
     if x_max <= x_min or y_max <= y_min:
@@ -960,6 +1025,30 @@ def brightness_contrast_adjust(img, alpha=1, beta=0):
         return _brightness_contrast_adjust_non_uint(img, alpha, beta)
 
 
+@clipped
+def brightness_contrast_adjust_batch(imgs, alpha=1, beta=0):
+    """Apply :func:`brightness_contrast_adjust` to a batch of images with shape (N, H, W) or (N, H, W, C).
+
+    Brightness is shifted by the mean of every single image, so each result matches the single image version.
+    """
+    means_shape = (-1,) + (1,) * (imgs.ndim - 1)
+    result = imgs.astype('float32')
+    if imgs.dtype == np.uint8:
+        # uint8 images are shifted by the mean of the source image, like the lookup table in the single image version
+        means = (beta * imgs.reshape(len(imgs), -1).mean(axis=1)).astype('float32')
+        if alpha != 1:
+            result *= alpha
+        if beta != 0:
+            result += means.reshape(means_shape)
+        return np.clip(result, 0, MAX_VALUES_BY_DTYPE[imgs.dtype])
+
+    if alpha != 1:
+        result *= alpha
+    if beta != 0:
+        result += beta * result.reshape(len(result), -1).mean(axis=1).reshape(means_shape)
+    return result
+
+
 @clipped
 def iso_noise(image, color_shift=0.05, intensity=0.5, random_state=None, **kwargs):
     """
@@ -1155,6 +1244,104 @@ def bbox_transpose(bbox, axis, rows, cols):
     return bbox
 
 
+def bboxes_vflip(bboxes, rows, cols):
+    """Flip an array of bounding boxes with shape (N, 4) vertically around the x-axis."""
+    x_min, y_min, x_max, y_max = bboxes.T
+    return np.stack([x_min, 1 - y_max, x_max, 1 - y_min], axis=1)
+
+
+def bboxes_hflip(bboxes, rows, cols):
+    """Flip an array of bounding boxes with shape (N, 4) horizontally around the y-axis."""
+    x_min, y_min, x_max, y_max = bboxes.T
+    return np.stack([1 - x_max, y_min, 1 - x_min, y_max], axis=1)
+
+
+def bboxes_flip(bboxes, d, rows, cols):
+    """Vectorized version of :func:`bbox_flip` for an array of bounding boxes with shape (N, 4).
+
+    Raises:
+        ValueError: if value of `d` is not -1, 0 or 1.
+
+    """
+    if d == 0:
+        bboxes = bboxes_vflip(bboxes, rows, cols)
+    elif d == 1:
+        bboxes = bboxes_hflip(bboxes, rows, cols)
+    elif d == -1:
+        bboxes = bboxes_hflip(bboxes, rows, cols)
+        bboxes = bboxes_vflip(bboxes, rows, cols)
+    else:
+        raise ValueError('Invalid d value {}. Valid values are -1, 0 and 1'.format(d))
+    return bboxes
+
+
+def crop_bboxes_by_coords(bboxes, crop_coords, crop_height, crop_width, rows, cols):
+    """Vectorized version of :func:`crop_bbox_by_coords` for an array of bounding boxes with shape (N, 4)."""
+    if rows == 0:
+        raise ValueError('Argument rows cannot be zero')
+    if cols == 0:
+        raise ValueError('Argument cols cannot be zero')
+    x1, y1 = crop_coords[:2]
+    bboxes = bboxes * [cols, rows, cols, rows] - [x1, y1, x1, y1]
+    return bboxes / [crop_width, crop_height, crop_width, crop_height]
+
+
+def bboxes_crop(bboxes, x_min, y_min, x_max, y_max, rows, cols):
+    crop_coords = [x_min, y_min, x_max, y_max]
+    crop_height = y_max - y_min
+    crop_width = x_max - x_min
+    return crop_bboxes_by_coords(bboxes, crop_coords, crop_height, crop_width, rows, cols)
+
+
+def bboxes_center_crop(bboxes, crop_height, crop_width, rows, cols):
+    crop_coords = get_center_crop_coords(rows, cols, crop_height, crop_width)
+    return crop_bboxes_by_coords(bboxes, crop_coords, crop_height, crop_width, rows, cols)
+
+
+def bboxes_random_crop(bboxes, crop_height, crop_width, h_start, w_start, rows, cols):
+    crop_coords = get_random_crop_coords(rows, cols, crop_height, crop_width, h_start, w_start)
+    return crop_bboxes_by_coords(bboxes, crop_coords, crop_height, crop_width, rows, cols)
+
+
+def bboxes_rot90(bboxes, factor, rows, cols):
+    """Vectorized version of :func:`bbox_rot90` for an array of bounding boxes with shape (N, 4)."""
+    if factor < 0 or factor > 3:
+        raise ValueError('Parameter n must be in range [0;3]')
+    x_min, y_min, x_max, y_max = bboxes.T
+    if factor == 1:
+        bboxes = np.stack([y_min, 1 - x_max, y_max, 1 - x_min], axis=1)
+    if factor == 2:
+        bboxes = np.stack([1 - x_max, 1 - y_max, 1 - x_min, 1 - y_min], axis=1)
+    if factor == 3:
+        bboxes = np.stack([1 - y_max, x_min, 1 - y_min, x_max], axis=1)
+    return bboxes
+
+
+def bboxes_rotate(bboxes, angle, rows, cols, interpolation):
+    """Vectorized version of :func:`bbox_rotate` for an array of bounding boxes with shape (N, 4)."""
+    scale = cols / float(rows)
+    x = bboxes[:, [0, 2, 2, 0]] - 0.5
+    y = bboxes[:, [1, 1, 3, 3]] - 0.5
+    angle = np.deg2rad(angle)
+    x_t = (np.cos(angle) * x * scale + np.sin(angle) * y) / scale
+    y_t = (-np.sin(angle) * x * scale + np.cos(angle) * y)
+    x_t = x_t + 0.5
+    y_t = y_t + 0.5
+    return np.stack([x_t.min(axis=1), y_t.min(axis=1), x_t.max(axis=1), y_t.max(axis=1)], axis=1)
+
+
+def bboxes_transpose(bboxes, axis, rows, cols):
+    """Vectorized version of :func:`bbox_transpose` for an array of bounding boxes with shape (N, 4)."""
+    x_min, y_min, x_max, y_max = bboxes.T
+    if axis != 0 and axis != 1:
+        raise ValueError('Axis must be either 0 or 1.')
+    if axis == 0:
+        bboxes = np.stack([y_min, x_min, y_max, x_max], axis=1)
+    if axis == 1:
+        bboxes = np.stack([1 - y_max, 1 - x_max, 1 - y_min, 1 - x_min], axis=1)
+    return bboxes
+
+
 def keypoint_vflip(kp, rows, cols):
     """Flip a keypoint vertically around the x-axis."""
     x, y, angle, scale = kp
@@ -1220,6 +1407,13 @@ def keypoint_rotate(keypoint, angle, rows, cols, **params):
     return [x, y, a + math.radians(angle), s]
 
 
+def keypoints_rotate(keypoints, angle, rows, cols, **params):
+    """Vectorized version of :func:`keypoint_rotate` for an array of keypoints with shape (N, 4)."""
+    matrix = cv2.getRotationMatrix2D(((cols - 1) * 0.5, (rows - 1) * 0.5), angle, 1.0)
+    keypoints = keypoints_affine(keypoints, matrix)
+    return keypoints + [0, 0, math.radians(angle), 0]
+
+
 def keypoint_scale(keypoint, scale_x, scale_y, **params):
     """Scales a keypoint by scale_x and scale_y."""
     x, y, a, s = keypoint
@@ -1246,6 +1440,77 @@ def keypoint_center_crop(bbox, crop_height, crop_width, rows, cols):
     return crop_keypoint_by_coords(bbox, crop_coords, crop_height, crop_width, rows, cols)
 
 
+def _wrap_angles(angles):
+    """Wrap an array of angles in radians into (-pi, pi], the range of `math.atan2`."""
+    return math.pi - np.mod(math.pi - angles, 2 * math.pi)
+
+
+def keypoints_vflip(keypoints, rows, cols):
+    """Flip an array of keypoints with shape (N, 4) vertically around the x-axis."""
+    x, y, angle, scale = keypoints.T
+    return np.stack([x, (rows - 1) - y, _wrap_angles(-angle), scale], axis=1)
+
+
+def keypoints_hflip(keypoints, rows, cols):
+    """Flip an array of keypoints with shape (N, 4) horizontally around the y-axis."""
+    x, y, angle, scale = keypoints.T
+    return np.stack([(cols - 1) - x, y, _wrap_angles(math.pi - angle), scale], axis=1)
+
+
+def keypoints_flip(keypoints, d, rows, cols):
+    """Vectorized version of :func:`keypoint_flip` for an array of keypoints with shape (N, 4).
+
+    Raises:
+        ValueError: if value of `d` is not -1, 0 or 1.
+
+    """
+    if d == 0:
+        keypoints = keypoints_vflip(keypoints, rows, cols)
+    elif d == 1:
+        keypoints = keypoints_hflip(keypoints, rows, cols)
+    elif d == -1:
+        keypoints = keypoints_hflip(keypoints, rows, cols)
+        keypoints = keypoints_vflip(keypoints, rows, cols)
+    else:
+        raise ValueError('Invalid d value {}. Valid values are -1, 0 and 1'.format(d))
+    return keypoints
+
+
+def keypoints_rot90(keypoints, factor, rows, cols, **params):
+    """Vectorized version of :func:`keypoint_rot90` for an array of keypoints with shape (N, 4)."""
+    if factor < 0 or factor > 3:
+        raise ValueError('Parameter n must be in range [0;3]')
+    x, y, angle, scale = keypoints.T
+    if factor == 1:
+        keypoints = np.stack([y, (cols - 1) - x, angle - math.pi / 2, scale], axis=1)
+    if factor == 2:
+        keypoints = np.stack([(cols - 1) - x, (rows - 1) - y, angle - math.pi, scale], axis=1)
+    if factor == 3:
+        keypoints = np.stack([(rows - 1) - y, x, angle + math.pi / 2, scale], axis=1)
+    return keypoints
+
+
+def keypoints_scale(keypoints, scale_x, scale_y, **params):
+    """Scales an array of keypoints with shape (N, 4) by scale_x and scale_y."""
+    return keypoints * [scale_x, scale_y, 1, max(scale_x, scale_y)]
+
+
+def crop_keypoints_by_coords(keypoints, crop_coords, crop_height, crop_width, rows, cols):
+    """Vectorized version of :func:`crop_keypoint_by_coords` for an array of keypoints with shape (N, 4)."""
+    x1, y1 = crop_coords[:2]
+    return keypoints - [x1, y1, 0, 0]
+
+
+def keypoints_random_crop(keypoints, crop_height, crop_width, h_start, w_start, rows, cols):
+    crop_coords = get_random_crop_coords(rows, cols, crop_height, crop_width, h_start, w_start)
+    return crop_keypoints_by_coords(keypoints, crop_coords, crop_height, crop_width, rows, cols)
+
+
+def keypoints_center_crop(keypoints, crop_height, crop_width, rows, cols):
+    crop_coords = get_center_crop_coords(rows, cols, crop_height, crop_width)
+    return crop_keypoints_by_coords(keypoints, crop_coords, crop_height, crop_width, rows, cols)
+
+
 def py3round(number):
     """Unified rounding in all python versions."""
     if abs(round(number) - number) == 0.5:
@@ -152,9 +152,15 @@ class VerticalFlip(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_vflip(bbox, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_vflip(bboxes, **params)
+
     def apply_to_keypoint(self, keypoint, **params):
         return F.keypoint_vflip(keypoint, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_vflip(keypoints, **params)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -183,9 +189,15 @@ class HorizontalFlip(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_hflip(bbox, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_hflip(bboxes, **params)
+
     def apply_to_keypoint(self, keypoint, **params):
         return F.keypoint_hflip(keypoint, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_hflip(keypoints, **params)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -218,9 +230,15 @@ class Flip(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_flip(bbox, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_flip(bboxes, **params)
+
     def apply_to_keypoint(self, keypoint, **params):
         return F.keypoint_flip(keypoint, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_flip(keypoints, **params)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -244,6 +262,9 @@ class Transpose(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_transpose(bbox, 0, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_transpose(bboxes, 0, **params)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -369,9 +390,15 @@ class RandomRotate90(DualTransform):
     def apply_to_bbox(self, bbox, factor=0, **params):
         return F.bbox_rot90(bbox, factor, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, factor=0, **params):
+        return F.bboxes_rot90(bboxes, factor, **params)
+
     def apply_to_keypoint(self, keypoint, factor=0, **params):
         return F.keypoint_rot90(keypoint, factor, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, factor=0, **params):
+        return F.keypoints_rot90(keypoints, factor, **params)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -399,6 +426,8 @@ class Rotate(DualTransform):
         uint8, float32
     """
 
+    is_affine = True
+
     def __init__(self, limit=90, interpolation=cv2.INTER_LINEAR, border_mode=cv2.BORDER_REFLECT_101,
                  value=None, mask_value=None, always_apply=False, p=.5):
         super(Rotate, self).__init__(always_apply, p)
@@ -420,9 +449,19 @@ class Rotate(DualTransform):
     def apply_to_bbox(self, bbox, angle=0, **params):
         return F.bbox_rotate(bbox, angle, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, angle=0, **params):
+        return F.bboxes_rotate(bboxes, angle, **params)
+
     def apply_to_keypoint(self, keypoint, angle=0, **params):
         return F.keypoint_rotate(keypoint, angle, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, angle=0, **params):
+        return F.keypoints_rotate(keypoints, angle, **params)
+
+    def get_affine_matrix(self, params):
+        matrix = F.get_shift_scale_rotate_matrix(params['angle'], 1.0, 0, 0, params['rows'], params['cols'])
+        return np.vstack([matrix, [0, 0, 1]])
+
     def get_transform_init_args_names(self):
         return ('limit', 'interpolation', 'border_mode', 'value', 'mask_value')
 
@@ -463,6 +502,9 @@ class RandomScale(DualTransform):
     def apply_to_keypoint(self, keypoint, scale=0, **params):
         return F.keypoint_scale(keypoint, scale, scale)
 
+    def apply_to_keypoints_batch(self, keypoints, scale=0, **params):
+        return F.keypoints_scale(keypoints, scale, scale)
+
     def get_transform_init_args(self):
         return {
             'interpolation': self.interpolation,
@@ -498,6 +540,8 @@ class ShiftScaleRotate(DualTransform):
         uint8, float32
     """
 
+    is_affine = True
+
     def __init__(self, shift_limit=0.0625, scale_limit=0.1, rotate_limit=45, interpolation=cv2.INTER_LINEAR,
                  border_mode=cv2.BORDER_REFLECT_101, value=None, mask_value=None, always_apply=False, p=0.5):
         super(ShiftScaleRotate, self).__init__(always_apply, p)
@@ -519,6 +563,10 @@ class ShiftScaleRotate(DualTransform):
                           **params):
         return F.keypoint_shift_scale_rotate(keypoint, angle, scale, dx, dy, rows, cols)
 
+    def apply_to_keypoints_batch(self, keypoints, angle=0, scale=0, dx=0, dy=0, rows=0, cols=0,
+                                 interpolation=cv2.INTER_LINEAR, **params):
+        return F.keypoints_shift_scale_rotate(keypoints, angle, scale, dx, dy, rows, cols)
+
     def get_params(self):
         return {'angle': random.uniform(self.rotate_limit[0], self.rotate_limit[1]),
                 'scale': random.uniform(self.scale_limit[0], self.scale_limit[1]),
@@ -528,6 +576,14 @@ class ShiftScaleRotate(DualTransform):
     def apply_to_bbox(self, bbox, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, **params):
         return F.bbox_shift_scale_rotate(bbox, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, **params):
+        return F.bboxes_shift_scale_rotate(bboxes, angle, scale, dx, dy, interpolation=cv2.INTER_LINEAR, **params)
+
+    def get_affine_matrix(self, params):
+        matrix = F.get_shift_scale_rotate_matrix(params['angle'], params['scale'], params['dx'], params['dy'],
+                                                 params['rows'], params['cols'])
+        return np.vstack([matrix, [0, 0, 1]])
+
     def get_transform_init_args(self):
         return {
             'shift_limit': self.shift_limit,
@@ -571,9 +627,15 @@ class CenterCrop(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_center_crop(bbox, self.height, self.width, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_center_crop(bboxes, self.height, self.width, **params)
+
     def apply_to_keypoint(self, keypoint, **params):
         return F.keypoint_center_crop(keypoint, self.height, self.width, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_center_crop(keypoints, self.height, self.width, **params)
+
     def get_transform_init_args_names(self):
         return ('height', 'width')
 
@@ -608,9 +670,15 @@ class RandomCrop(DualTransform):
     def apply_to_bbox(self, bbox, **params):
         return F.bbox_random_crop(bbox, self.height, self.width, **params)
 
+    def apply_to_bboxes_batch(self, bboxes, **params):
+        return F.bboxes_random_crop(bboxes, self.height, self.width, **params)
+
     def apply_to_keypoint(self, keypoint, **params):
         return F.keypoint_random_crop(keypoint, self.height, self.width, **params)
 
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_random_crop(keypoints, self.height, self.width, **params)
+
     def get_transform_init_args_names(self):
         return ('height', 'width')
 
@@ -709,6 +777,10 @@ class RandomSizedCrop(DualTransform):
     def apply_to_bbox(self, bbox, crop_height=0, crop_width=0, h_start=0, w_start=0, rows=0, cols=0, **params):
         return F.bbox_random_crop(bbox, crop_height, crop_width, h_start, w_start, rows, cols)
 
+    def apply_to_bboxes_batch(self, bboxes, crop_height=0, crop_width=0, h_start=0, w_start=0, rows=0, cols=0,
+                              **params):
+        return F.bboxes_random_crop(bboxes, crop_height, crop_width, h_start, w_start, rows, cols)
+
     def apply_to_keypoint(self, keypoint, crop_height=0, crop_width=0, h_start=0, w_start=0, rows=0, cols=0, **params):
         keypoint = F.keypoint_random_crop(keypoint, crop_height, crop_width, h_start, w_start, rows, cols)
         scale_x = self.width / crop_height
@@ -778,6 +850,10 @@ class RandomSizedBBoxSafeCrop(DualTransform):
     def apply_to_bbox(self, bbox, crop_height=0, crop_width=0, h_start=0, w_start=0, rows=0, cols=0, **params):
         return F.bbox_random_crop(bbox, crop_height, crop_width, h_start, w_start, rows, cols)
 
+    def apply_to_bboxes_batch(self, bboxes, crop_height=0, crop_width=0, h_start=0, w_start=0, rows=0, cols=0,
+                              **params):
+        return F.bboxes_random_crop(bboxes, crop_height, crop_width, h_start, w_start, rows, cols)
+
     @property
     def targets_as_params(self):
         return ['image']
@@ -1027,6 +1103,9 @@ class Normalize(ImageOnlyTransform):
     def apply(self, image, **params):
         return F.normalize(image, self.mean, self.std, self.max_pixel_value)
 
+    def apply_to_images(self, images, **params):
+        return F.normalize(images, self.mean, self.std, self.max_pixel_value)
+
     def get_transform_init_args_names(self):
         return ('mean', 'std', 'max_pixel_value')
 
@@ -1739,6 +1818,9 @@ class RandomBrightnessContrast(ImageOnlyTransform):
     def apply(self, img, alpha=1., beta=0., **params):
         return F.brightness_contrast_adjust(img, alpha, beta)
 
+    def apply_to_images(self, imgs, alpha=1., beta=0., **params):
+        return F.brightness_contrast_adjust_batch(imgs, alpha, beta)
+
     def get_params(self):
         return {
             'alpha': 1.0 + random.uniform(self.contrast_limit[0], self.contrast_limit[1]),
@@ -2097,6 +2179,9 @@ class InvertImg(ImageOnlyTransform):
     def apply(self, img, **params):
         return F.invert(img)
 
+    def apply_to_images(self, imgs, **params):
+        return F.invert(imgs)
+
     def get_transform_init_args_names(self):
         return ()
 
@@ -2174,6 +2259,9 @@ class ToFloat(ImageOnlyTransform):
     def apply(self, img, **params):
         return F.to_float(img, self.max_value)
 
+    def apply_to_images(self, imgs, **params):
+        return F.to_float(imgs, self.max_value)
+
     def get_transform_init_args_names(self):
         return ('max_value',)
 
@@ -2209,6 +2297,9 @@ class FromFloat(ImageOnlyTransform):
     def apply(self, img, **params):
         return F.from_float(img, self.dtype, self.max_value)
 
+    def apply_to_images(self, imgs, **params):
+        return F.from_float(imgs, self.dtype, self.max_value)
+
     def get_transform_init_args(self):
         return {
             'dtype': self.dtype.name,
@@ -2229,7 +2320,7 @@ class Lambda(NoOp):
         p (float): probability of applying the transform. Default: 1.0.
 
     Targets:
-        image, mask, bboxes, keypoints
+        image, mask, bboxes, keypoints, images
 
     Image types:
         Any
@@ -2253,6 +2344,10 @@ class Lambda(NoOp):
         fn = self.custom_apply_fns['image']
         return fn(img, **params)
 
+    def apply_to_images(self, imgs, **params):
+        fn = self.custom_apply_fns['image']
+        return np.stack([fn(img, **params) for img in imgs])
+
     def apply_to_mask(self, mask, **params):
         fn = self.custom_apply_fns['mask']
         return fn(mask, **params)
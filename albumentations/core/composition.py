@@ -2,12 +2,14 @@ from __future__ import division
 
 import random
 
+import cv2
 import numpy as np
 
+from albumentations.augmentations import functional as F
 from albumentations.augmentations.keypoints_utils import KeypointsProcessor
-from albumentations.core.serialization import SerializableMeta
+from albumentations.core.serialization import SerializableMeta, SERIALIZABLE_REGISTRY
 from albumentations.core.six import add_metaclass
-from albumentations.core.transforms_interface import DualTransform
+from albumentations.core.transforms_interface import DualTransform, HistoryEntry
 from albumentations.core.utils import format_args, Params
 from albumentations.augmentations.bbox_utils import BboxProcessor
 
@@ -99,6 +101,20 @@ class BaseCompose(object):
             for t in self.transforms:
                 t.add_targets(additional_targets)
 
+    @property
+    def track_history(self):
+        return all(t.track_history for t in self.transforms)
+
+    @track_history.setter
+    def track_history(self, value):
+        """Enable or disable history tracking for all nested transforms.
+
+        While enabled, every transformed target carries the list of applied transforms in its `transforms`
+        attribute. Numpy arrays are returned as `TransformsArray` and lists or tuples as `TransformsList` for that.
+        """
+        for t in self.transforms:
+            t.track_history = value
+
 
 class Compose(BaseCompose):
     """Compose transforms and handle all transformations regrading bounding boxes
@@ -109,10 +125,16 @@ class Compose(BaseCompose):
         keypoint_params (KeypointParams): Parameters for keypoints transforms
         additional_targets (dict): Dict with keys - new target name, values - old target name. ex: {'image2': 'image'}
         p (float): probability of applying all list of transforms. Default: 1.0.
+        fuse_affine (bool): multiply the matrices of consecutive affine transforms (see `BasicTransform.is_affine`)
+            that share interpolation and border settings and warp the targets once. This is faster and avoids
+            repeated interpolation, but the result is not bit exact with applying the transforms one by one.
+            Default: False.
     """
 
-    def __init__(self, transforms, bbox_params=None, keypoint_params=None, additional_targets=None, p=1.0):
+    def __init__(self, transforms, bbox_params=None, keypoint_params=None, additional_targets=None, p=1.0,
+                 fuse_affine=False):
         super(Compose, self).__init__([t for t in transforms if t is not None], p)
+        self.fuse_affine = fuse_affine
 
         self.processors = {}
         if bbox_params:
@@ -150,19 +172,52 @@ class Compose(BaseCompose):
         transforms = self.transforms if need_to_run else self.transforms.get_always_apply(self.transforms)
         dual_start_end = transforms.start_end if self.processors else None
 
+        # Sampled (transform, params) pairs of affine transforms that are waiting to be applied at once
+        affine_group = []
         for idx, t in enumerate(transforms):
             if dual_start_end is not None and idx == dual_start_end[0]:
                 for p in self.processors.values():
                     p.preprocess(data)
 
-            data = t(force_apply=force_apply, **data)
+            if self.fuse_affine and getattr(t, '_uses_affine_fusion', False):
+                if affine_group and not _same_border_args(affine_group[0][0], t):
+                    data = self._apply_affine_group(affine_group, data)
+                    affine_group = []
+                params = t.sample_params(force_apply, data)
+                if params is not None:
+                    affine_group.append((t, params))
+            else:
+                if affine_group:
+                    data = self._apply_affine_group(affine_group, data)
+                    affine_group = []
+                data = t(force_apply=force_apply, **data)
 
             if dual_start_end is not None and idx == dual_start_end[1]:
+                if affine_group:
+                    data = self._apply_affine_group(affine_group, data)
+                    affine_group = []
                 for p in self.processors.values():
                     p.postprocess(data)
 
+        if affine_group:
+            data = self._apply_affine_group(affine_group, data)
         return data
 
+    def _apply_affine_group(self, affine_group, data):
+        if len(affine_group) == 1:
+            t, params = affine_group[0]
+            return t.apply_with_params(params, data)
+
+        matrix = np.eye(3)
+        for t, params in affine_group:
+            matrix = t.get_affine_matrix(params).dot(matrix)
+        fused = _FusedAffine(matrix, *affine_group[0][0].get_affine_border_args())
+        fused.affine_group = affine_group
+        fused.add_targets(self.additional_targets)
+        # Calling the fused transform would draw its probability gate from `random` and shift every later sample
+        params = fused.update_params(fused.get_params(), **data)
+        return fused.apply_with_params(params, data)
+
     def _to_dict(self):
         dictionary = super(Compose, self)._to_dict()
         bbox_processor = self.processors.get('bboxes')
@@ -171,10 +226,70 @@ class Compose(BaseCompose):
             'bbox_params': bbox_processor.params._to_dict() if bbox_processor else None,
             'keypoint_params': keypoints_processor.params._to_dict() if keypoints_processor else None,
             'additional_targets': self.additional_targets,
+            'fuse_affine': self.fuse_affine,
         })
         return dictionary
 
 
+def _same_border_args(first, second):
+    # Padding values may be numpy arrays, which can't be compared with `==`
+    return all(np.array_equal(first_arg, second_arg)
+               for first_arg, second_arg in zip(first.get_affine_border_args(), second.get_affine_border_args()))
+
+
+class _FusedAffine(DualTransform):
+    """Warp the input by a 3x3 affine matrix that combines several affine transforms of `Compose`.
+
+    The history of the targets records the fused transforms of `affine_group`, not the `_FusedAffine` itself.
+    """
+
+    def __init__(self, matrix, interpolation, border_mode, value, mask_value):
+        super(_FusedAffine, self).__init__(always_apply=True, p=1.0)
+        self.matrix = matrix
+        self.interpolation = interpolation
+        self.border_mode = border_mode
+        self.value = value
+        self.mask_value = mask_value
+        # Sampled (transform, params) pairs the matrix was built from
+        self.affine_group = []
+
+    def keep_memory(self, quant, **params):
+        memory = None
+        for t, t_params in self.affine_group:
+            if not t.track_history:
+                continue
+            if memory is None:
+                memory = t.keep_memory(quant, **t_params)
+            else:
+                memory.append(HistoryEntry(t, t_params))
+        return memory
+
+    def apply(self, img, interpolation=cv2.INTER_LINEAR, **params):
+        return F.warp_affine(img, self.matrix, interpolation, self.border_mode, self.value)
+
+    def apply_to_mask(self, img, **params):
+        return F.warp_affine(img, self.matrix, cv2.INTER_NEAREST, self.border_mode, self.mask_value)
+
+    def apply_to_bbox(self, bbox, rows=0, cols=0, **params):
+        return F.bboxes_affine(np.array([bbox], dtype=np.float64), self.matrix, rows, cols)[0].tolist()
+
+    def apply_to_bboxes_batch(self, bboxes, rows=0, cols=0, **params):
+        return F.bboxes_affine(bboxes, self.matrix, rows, cols)
+
+    def apply_to_keypoint(self, keypoint, **params):
+        return F.keypoints_similarity(np.array([keypoint], dtype=np.float64), self.matrix)[0].tolist()
+
+    def apply_to_keypoints_batch(self, keypoints, **params):
+        return F.keypoints_similarity(keypoints, self.matrix)
+
+    def get_transform_init_args_names(self):
+        return ('matrix', 'interpolation', 'border_mode', 'value', 'mask_value')
+
+
+# The metaclass registers every transform, but the fused transform is private to Compose and never serialized
+del SERIALIZABLE_REGISTRY[_FusedAffine.get_class_fullname()]
+
+
 class OneOf(BaseCompose):
     """Select one of transforms to apply
 
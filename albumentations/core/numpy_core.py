@@ -2,6 +2,13 @@ import numpy as np
 
 
 class TransformsArray(np.ndarray):
+    """Numpy array that keeps the history of transforms applied to it in `transforms`.
+
+    Views and results of numpy operations share the history list of the array they were created from.
+    """
+    # Default for arrays that were not created from a TransformsArray, so `__array_finalize__` never has to probe
+    # its argument for the attribute
+    transforms = None
 
     def __new__(cls, input_array, transforms=None):
         obj = np.asarray(input_array).view(cls)
@@ -11,6 +18,5 @@ class TransformsArray(np.ndarray):
         return obj
 
     def __array_finalize__(self, obj):
-        if obj is None:
-            return
-        self.transforms = getattr(obj, 'transforms', None)
+        if isinstance(obj, TransformsArray):
+            self.transforms = obj.transforms
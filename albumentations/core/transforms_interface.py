@@ -1,8 +1,11 @@
 from __future__ import absolute_import
 
 import random
+from collections import namedtuple
+from functools import partial
 
 import cv2
+import numpy as np
 
 from albumentations.core.serialization import SerializableMeta
 from albumentations.core.six import add_metaclass
@@ -10,7 +13,39 @@ from albumentations.core.utils import format_args
 from albumentations.core.numpy_core import TransformsArray
 from albumentations.core.lists_core import TransformsList
 
-__all__ = ['to_tuple', 'BasicTransform', 'DualTransform', 'ImageOnlyTransform', 'NoOp']
+__all__ = ['to_tuple', 'BasicTransform', 'DualTransform', 'ImageOnlyTransform', 'NoOp', 'HistoryEntry']
+
+# An entry of the `transforms` history stored on targets when `track_history` is enabled
+HistoryEntry = namedtuple('HistoryEntry', ['transform', 'params'])
+
+# Functions `fn(transform, img, **params)` that apply an image-only transform to a CUDA tensor, keyed by the exact
+# transform class. Subclasses are not covered by the function of their parent because they may work differently.
+TENSOR_APPLY_REGISTRY = {}
+
+# Wrappers for targets that cannot store the `transforms` attribute themselves, keyed by the exact target type
+_MEMORY_WRAPPERS = {
+    np.ndarray: TransformsArray,
+    list: TransformsList,
+    tuple: TransformsList,
+}
+
+
+def _find_memory_wrapper(quant):
+    wrapper = _MEMORY_WRAPPERS.get(type(quant))
+    if wrapper is None:
+        wrapper = next((w for base, w in _MEMORY_WRAPPERS.items() if isinstance(quant, base)), None)
+    return wrapper
+
+
+def _attach_memory(quant, memory):
+    """Return `quant` carrying the history list `memory`, wrapping it if it can't hold the attribute itself."""
+    if memory is None or getattr(quant, 'transforms', None) is memory:
+        return quant
+    wrapper = _find_memory_wrapper(quant)
+    if wrapper is not None:
+        return wrapper(quant, memory)
+    quant.transforms = memory
+    return quant
 
 
 def to_tuple(param, low=None, bias=None):
@@ -33,87 +68,301 @@ def to_tuple(param, low=None, bias=None):
             param = - param, + param
         else:
             param = (low, param) if low < param else (param, low)
+    elif type(param) is tuple:
+        pass
     elif isinstance(param, (list, tuple)):
         param = tuple(param)
     else:
         raise ValueError('Argument param must be either scalar (int, float) or tuple')
 
     if bias is not None:
-        return tuple([bias + x for x in param])
+        if len(param) == 2:
+            return bias + param[0], bias + param[1]
+        return tuple(bias + x for x in param)
+
+    return param
+
+
+def _is_cuda_tensor(img):
+    """Check whether `img` is a `torch.Tensor` on a CUDA device without importing torch."""
+    return getattr(img, 'is_cuda', False) is True
 
-    return tuple(param)
 
+# Below this number of items, converting a list of bboxes or keypoints to an array and back costs more than the
+# batch function saves
+_BATCH_MIN_SIZE = 32
+
+
+def _apply_to_batch(batch_function, items, num_coords, **params):
+    """Apply a vectorized `batch_function` to the first `num_coords` columns of every item in `items`.
+
+    `batch_function` receives a float array with shape (N, num_coords) and must return an array of the same shape.
+    The remaining columns (labels and other extra fields) are attached back untouched. `items` is either a numpy
+    array, which is returned as a numpy array, or a list of lists, which is returned as a list of lists.
+    """
+    if isinstance(items, np.ndarray):
+        coords = batch_function(items[:, :num_coords].astype(np.float64), **params)
+        return np.hstack([coords, items[:, num_coords:]])
+
+    coords = batch_function(np.array([item[:num_coords] for item in items], dtype=np.float64), **params)
+    return [coord + item[num_coords:] for coord, item in zip(coords.tolist(), items)]
+
+
+def _apply_to_items(item_function, batch_function, items, num_coords, **params):
+    """Apply a transform to the first `num_coords` values of every bbox or keypoint in `items`.
+
+    `batch_function` (if not None) is used for numpy arrays and for at least `_BATCH_MIN_SIZE` items of any other
+    iterable, `item_function` is called for every item otherwise. Numpy arrays are returned as numpy arrays, any
+    other iterable is returned as a list of lists.
+    """
+    if isinstance(items, np.ndarray):
+        if not len(items):
+            return items.copy()
+        if batch_function is not None:
+            return _apply_to_batch(batch_function, items, num_coords, **params)
+        result = [item_function(item[:num_coords], **params) + item[num_coords:] for item in items.tolist()]
+        return np.array(result, dtype=np.result_type(items.dtype, np.float64))
 
-@add_metaclass(SerializableMeta)
+    items = [list(item) for item in items]
+    if batch_function is not None and len(items) >= _BATCH_MIN_SIZE:
+        return _apply_to_batch(batch_function, items, num_coords, **params)
+    return [item_function(item[:num_coords], **params) + item[num_coords:] for item in items]
+
+
+def _has_batch_function(cls, item_method, batch_method):
+    """Check whether `cls` has `batch_method` from the class that defines its `item_method` or from a subclass of it.
+
+    A batch function inherited from above that class doesn't know about the overridden `item_method`.
+    """
+    for klass in cls.__mro__:
+        if batch_method in vars(klass):
+            return True
+        if item_method in vars(klass):
+            return False
+    return False
+
+
+# Methods that apply an affine transform or sample its parameters, see `_describes_affine_matrix`
+_AFFINE_METHODS = ('apply', 'apply_to_mask', 'apply_to_masks', 'apply_to_bbox', 'apply_to_bboxes',
+                   'apply_to_bboxes_batch', 'apply_to_keypoint', 'apply_to_keypoints', 'apply_to_keypoints_batch',
+                   'get_params', 'update_params', 'get_params_dependent_on_targets')
+
+
+def _describes_affine_matrix(cls):
+    """Check whether `get_affine_matrix` of an `is_affine` class still describes the whole transform.
+
+    It doesn't when a subclass overrides one of `_AFFINE_METHODS` without defining its own `get_affine_matrix`.
+    """
+    if not cls.is_affine:
+        return False
+    for klass in cls.__mro__:
+        if 'get_affine_matrix' in vars(klass):
+            return True
+        if any(method in vars(klass) for method in _AFFINE_METHODS):
+            return False
+    return False
+
+
+class _TransformMeta(SerializableMeta):
+    """Metaclass of transforms that records at class creation which optional steps of `__call__` a class needs.
+
+    A step is needed when the class overrides the property that drives it, so transforms that keep the defaults
+    of `BasicTransform` skip it without evaluating the property on every call. The batch functions of bboxes and
+    keypoints are resolved the same way, see `DualTransform`, and so is `is_affine`, see `BasicTransform`.
+    """
+
+    def __new__(meta, name, bases, class_dict):
+        cls = super(_TransformMeta, meta).__new__(meta, name, bases, class_dict)
+        root = [klass for klass in cls.__mro__ if isinstance(klass, _TransformMeta)][-1]
+        cls._uses_targets_as_params = cls.targets_as_params is not root.targets_as_params
+        cls._uses_target_dependence = cls.target_dependence is not root.target_dependence
+        cls._uses_bboxes_batch = _has_batch_function(cls, 'apply_to_bbox', 'apply_to_bboxes_batch')
+        cls._uses_keypoints_batch = _has_batch_function(cls, 'apply_to_keypoint', 'apply_to_keypoints_batch')
+        cls._uses_affine_fusion = _describes_affine_matrix(cls)
+        return cls
+
+
+@add_metaclass(_TransformMeta)
 class BasicTransform(object):
+    # Record every application in the `transforms` attribute of the targets, see `keep_memory`
+    track_history = False
+    # The whole transform can be described by `get_affine_matrix` and `get_affine_border_args`, so `Compose` may
+    # fuse it with its neighbours. The matrix must be a similarity: a rotation, an uniform scale and a shift, because
+    # keypoint angles and scales are derived from it.
+    # Subclasses that override how the transform is applied or how its parameters are sampled are not fused,
+    # unless they also define their own `get_affine_matrix`
+    is_affine = False
+
     def __init__(self, always_apply=False, p=0.5):
         self.p = p
         self.always_apply = always_apply
         self._additional_targets = {}
+        # Resolved target functions, keyed by target name
+        self._target_fn_cache = {}
+
+    def __getstate__(self):
+        # Bound methods in the cache are recreated lazily, they don't need to be pickled
+        state = self.__dict__.copy()
+        state['_target_fn_cache'] = {}
+        return state
 
     def __call__(self, force_apply=False, **kwargs):
         if (random.random() < self.p) or self.always_apply or force_apply:
             params = self.get_params()
             params = self.update_params(params, **kwargs)
-            if self.targets_as_params:
-                targets_as_params = {k: kwargs[k] for k in self.targets_as_params}
-                params_dependent_on_targets = self.get_params_dependent_on_targets(targets_as_params)
-                params.update(params_dependent_on_targets)
-            res = {}
-            for key, arg in kwargs.items():
-                if arg is not None:
-                    target_function = self._get_target_function(key)
-                    target_dependencies = {k: kwargs[k] for k in self.target_dependence.get(key, [])}
-                    res[key] = target_function(arg, **dict(params, **target_dependencies))
-                else:
-                    res[key] = None
-            return res
+            if self._uses_targets_as_params:
+                params = self._update_params_dependent_on_targets(params, kwargs)
+            if self._uses_target_dependence:
+                return self._apply_with_target_dependence(params, kwargs)
+            get_target_function = self._get_target_function
+            # Keyword unpacking copies the dict, so all targets can share params
+            return {key: get_target_function(key)(arg, **params) if arg is not None else None
+                    for key, arg in kwargs.items()}
         return kwargs
 
+    def sample_params(self, force_apply, data):
+        """Decide whether the transform should be applied to the `data` dict and sample its parameters.
+
+        `__call__` is `sample_params` followed by `apply_with_params`, `Compose` uses them separately to fuse
+        affine transforms.
+
+        Returns:
+            dict: parameters for `apply_with_params` or None if the transform should not be applied.
+        """
+        if (random.random() < self.p) or self.always_apply or force_apply:
+            params = self.get_params()
+            params = self.update_params(params, **data)
+            if self._uses_targets_as_params:
+                params = self._update_params_dependent_on_targets(params, data)
+            return params
+        return None
+
+    def apply_with_params(self, params, data):
+        """Apply the transform with the sampled `params` to every target of the `data` dict."""
+        if self._uses_target_dependence:
+            return self._apply_with_target_dependence(params, data)
+        get_target_function = self._get_target_function
+        return {key: get_target_function(key)(arg, **params) if arg is not None else None
+                for key, arg in data.items()}
+
+    def _update_params_dependent_on_targets(self, params, data):
+        targets_as_params = self.targets_as_params
+        if targets_as_params:
+            if 'image' not in data and 'images' in data:
+                # A batch shares one set of parameters, which is computed from its first image
+                data = dict(data, image=data['images'][0])
+            params.update(self.get_params_dependent_on_targets({k: data[k] for k in targets_as_params}))
+        return params
+
+    def _apply_with_target_dependence(self, params, data):
+        get_target_function = self._get_target_function
+        res = {}
+        # Properties used inside the loop are looked up once per call
+        target_dependence = self.target_dependence
+        # Copy of params that receives the dependencies of one target at a time
+        scratch = None
+        for key in data:
+            arg = data[key]
+            if arg is not None:
+                target_function = get_target_function(key)
+                dependencies = target_dependence.get(key)
+                if dependencies:
+                    if scratch is None:
+                        scratch = params.copy()
+                    for k in dependencies:
+                        scratch[k] = data[k]
+                    res[key] = target_function(arg, **scratch)
+                    for k in dependencies:
+                        if k in params:
+                            scratch[k] = params[k]
+                        else:
+                            del scratch[k]
+                else:
+                    res[key] = target_function(arg, **params)
+            else:
+                res[key] = None
+        return res
+
     def __repr__(self):
         state = self.get_base_init_args()
         state.update(self.get_transform_init_args())
         return '{name}({args})'.format(name=self.__class__.__name__, args=format_args(state))
 
     def _get_target_function(self, key):
-        transform_key = key
-        if key in self._additional_targets:
-            transform_key = self._additional_targets.get(key, None)
-
-        target_function = self.targets.get(transform_key, lambda x, **p: x)
+        target_function = self._target_fn_cache.get(key)
+        if target_function is None:
+            transform_key = key
+            if key in self._additional_targets:
+                transform_key = self._additional_targets.get(key, None)
+
+            target_function = self.targets.get(transform_key, lambda x, **p: x)
+            self._target_fn_cache[key] = target_function
         return target_function
 
     def keep_memory(self, quant, **params):
-        try:
-            getattr(quant, 'transforms')
-        except AttributeError:
-            try:
-                quant.transforms = []
-            except AttributeError:
-                import numpy as np
-                if isinstance(quant, np.ndarray):
-                    quant = TransformsArray(quant)
-                elif isinstance(quant, list):
-                    quant = TransformsList(quant)
-                else:
-                    raise
-        quant.transforms.append({'transform': self, 'params': params})
+        """Append the application of this transform to the history of `quant` if `track_history` is enabled.
+
+        Returns:
+            list: the history of `quant` or None if history is not tracked. Targets that can't store the history
+            themselves, like plain numpy arrays and lists, get a new history that `_apply_with_memory` attaches to
+            the transformed target.
+        """
+        if not self.track_history:
+            return None
+        memory = getattr(quant, 'transforms', None)
+        if memory is None:
+            memory = []
+            if type(quant) not in _MEMORY_WRAPPERS:
+                try:
+                    quant.transforms = memory
+                except AttributeError:
+                    if _find_memory_wrapper(quant) is None:
+                        raise
+        memory.append(HistoryEntry(self, params))
+        return memory
 
     def apply(self, img, **params):
         raise NotImplementedError
 
-    def _apply(self, quant, *args, **kwargs):
-        self.keep_memory(quant, *args, **kwargs)
-        return self.apply(quant, *args, **kwargs)
+    def _apply(self, quant, **params):
+        return self._apply_with_memory(self.apply, quant, **params)
+
+    def _apply_with_memory(self, function, quant, **params):
+        if not self.track_history and not isinstance(quant, TransformsArray):
+            return function(quant, **params)
+        memory = self.keep_memory(quant, **params)
+        if memory is None and isinstance(quant, TransformsArray):
+            memory = quant.transforms
+        # Transformed targets are usually new objects, e.g. cv2 returns plain arrays, so the history is attached
+        # to the result to travel with it through the pipeline
+        return _attach_memory(function(quant, **params), memory)
 
     def get_params(self):
         return {}
 
+    def get_affine_matrix(self, params):
+        """Return a 3x3 matrix that maps pixel coordinates of the input to the output for the given parameters.
+
+        Only transforms with `is_affine = True` implement this method. The matrix may only combine a rotation, an
+        uniform scale and a shift, like the matrices `F.keypoints_similarity` accepts.
+        """
+        raise NotImplementedError('Method get_affine_matrix is not implemented in class ' + self.__class__.__name__)
+
+    def get_affine_border_args(self):
+        """Return the (interpolation, border_mode, value, mask_value) used to warp the targets by the affine matrix.
+
+        Only transforms with `is_affine = True` use this method. Attributes the transform doesn't have fall back to
+        cv2.INTER_LINEAR, cv2.BORDER_REFLECT_101 and no padding values.
+        """
+        return (getattr(self, 'interpolation', cv2.INTER_LINEAR), getattr(self, 'border_mode', cv2.BORDER_REFLECT_101),
+                getattr(self, 'value', None), getattr(self, 'mask_value', None))
+
     @property
     def targets(self):
         # you must specify targets in subclass
         # for example: ('image', 'mask')
         #              ('image', 'boxes')
+        # It is read once per target key, `_get_target_function` caches the result until `add_targets` is called
         raise NotImplementedError
 
     def update_params(self, params, **kwargs):
@@ -121,9 +370,13 @@ class BasicTransform(object):
             params['interpolation'] = self.interpolation
         if hasattr(self, 'fill_value'):
             params['fill_value'] = self.fill_value
-        params.update(
-            {'cols': kwargs['image'].shape[1],
-             'rows': kwargs['image'].shape[0]})
+        # A batch of images may also be a list of arrays, its size is read from the first image
+        image = kwargs['image'] if 'image' in kwargs else kwargs['images'][0]
+        if isinstance(image, np.ndarray) or not _is_cuda_tensor(image):
+            rows, cols = image.shape[:2]
+        else:
+            rows, cols = image.shape[-2:]
+        params.update({'cols': cols, 'rows': rows})
         return params
 
     @property
@@ -140,6 +393,7 @@ class BasicTransform(object):
             additional_targets (dict): keys - new target name, values - old target name. ex: {'image2': 'image'}
         """
         self._additional_targets = additional_targets
+        self._target_fn_cache = {}
 
     @property
     def targets_as_params(self):
@@ -180,27 +434,40 @@ class BasicTransform(object):
 
 
 class DualTransform(BasicTransform):
-    """Transform for segmentation task."""
+    """Transform for segmentation task.
+
+    Subclasses may define `apply_to_bboxes_batch` and `apply_to_keypoints_batch`, which receive all bounding boxes
+    (or keypoints) at once as a float array with shape (N, 4). When present, they are used instead of calling
+    `apply_to_bbox` and `apply_to_keypoint` for numpy arrays and for lists of at least `_BATCH_MIN_SIZE` items. A
+    subclass that overrides `apply_to_bbox` or `apply_to_keypoint` doesn't use the batch function inherited from its
+    parents, unless it defines its own.
+    """
 
     @property
     def targets(self):
         return {'image': self._apply,
+                'images': self._apply_to_images,
                 'mask': self._apply_to_mask,
                 'masks': self.apply_to_masks,
                 'bboxes': self._apply_to_bboxes,
                 'keypoints': self._apply_to_keypoints}
 
+    def apply_to_images(self, imgs, **params):
+        # Geometric transforms of a batch would leave any masks, bboxes and keypoints of its images behind
+        raise NotImplementedError('The images target is supported only by image-only transforms, {name} is a dual '
+                                  'transform'.format(name=self.__class__.__name__))
+
     def _apply_to_bboxes(self, bboxes, **params):
-        self.keep_memory(bboxes, **params)
-        return self.apply_to_bboxes(bboxes, **params)
+        return self._apply_with_memory(self.apply_to_bboxes, bboxes, **params)
 
     def _apply_to_keypoints(self, keypoints, **params):
-        self.keep_memory(keypoints, **params)
-        return self.apply_to_keypoints(keypoints, **params)
+        return self._apply_with_memory(self.apply_to_keypoints, keypoints, **params)
 
     def _apply_to_mask(self, mask, **params):
-        self.keep_memory(mask, **params)
-        return self.apply_to_mask(mask, **params)
+        return self._apply_with_memory(self.apply_to_mask, mask, **params)
+
+    def _apply_to_images(self, imgs, **params):
+        return self._apply_with_memory(self.apply_to_images, imgs, **params)
 
     def apply_to_bbox(self, bbox, **params):
         raise NotImplementedError('Method apply_to_bbox is not implemented in class ' + self.__class__.__name__)
@@ -209,30 +476,76 @@ class DualTransform(BasicTransform):
         raise NotImplementedError('Method apply_to_keypoint is not implemented in class ' + self.__class__.__name__)
 
     def apply_to_bboxes(self, bboxes, **params):
-        bboxes = [list(bbox) for bbox in bboxes]
-        return [self.apply_to_bbox(bbox[:4], **params) + bbox[4:] for bbox in bboxes]
+        batch_function = self.apply_to_bboxes_batch if self._uses_bboxes_batch else None
+        return _apply_to_items(self.apply_to_bbox, batch_function, bboxes, 4, **params)
 
     def apply_to_keypoints(self, keypoints, **params):
-        keypoints = [list(keypoint) for keypoint in keypoints]
-        return [self.apply_to_keypoint(keypoint[:4], **params) + keypoint[4:] for keypoint in keypoints]
+        batch_function = self.apply_to_keypoints_batch if self._uses_keypoints_batch else None
+        return _apply_to_items(self.apply_to_keypoint, batch_function, keypoints, 4, **params)
 
     def apply_to_mask(self, img, **params):
         return self.apply(img, **{k: cv2.INTER_NEAREST if k == 'interpolation' else v for k, v in params.items()})
 
     def apply_to_masks(self, masks, **params):
+        if isinstance(masks, np.ndarray) and masks.ndim >= 3 and len(masks):
+            # A stacked array of masks is transformed into one preallocated output array
+            first_mask = self.apply_to_mask(masks[0], **params)
+            result = np.empty((len(masks),) + first_mask.shape, dtype=first_mask.dtype)
+            result[0] = first_mask
+            for i in range(1, len(masks)):
+                result[i] = self.apply_to_mask(masks[i], **params)
+            return result
         return [self.apply_to_mask(mask, **params) for mask in masks]
 
 
 class ImageOnlyTransform(BasicTransform):
-    """Transform applied to image only."""
+    """Transform applied to image only.
+
+    Besides `image`, the transform accepts an `images` target: a batch of images with shape (N, H, W) or
+    (N, H, W, C) that is transformed with a single set of parameters. Parameters that depend on the image (see
+    `targets_as_params`) are computed from the first image of the batch. Subclasses may override `apply_to_images`
+    to process the whole batch at once instead of image by image.
+
+    Both targets also accept a `torch.Tensor` on a CUDA device with shape (C, H, W) or (N, C, H, W). It is passed
+    to the function registered for the exact class of the transform in `TENSOR_APPLY_REGISTRY`, so the data never
+    leaves the GPU. Importing `albumentations.pytorch.gpu` registers the transforms it supports.
+    """
 
     @property
     def targets(self):
-        return {'image': self.apply}
+        return {'image': self._apply,
+                'images': self._apply_to_images}
+
+    def _apply(self, img, **params):
+        # Almost no class is registered, so the registry is checked before probing `img`
+        tensor_function = TENSOR_APPLY_REGISTRY.get(type(self))
+        if tensor_function is not None and _is_cuda_tensor(img):
+            return self._apply_with_memory(partial(tensor_function, self), img, **params)
+        if not self.track_history and type(img) is np.ndarray:
+            return self.apply(img, **params)
+        return self._apply_with_memory(self.apply, img, **params)
+
+    def _apply_to_images(self, imgs, **params):
+        tensor_function = TENSOR_APPLY_REGISTRY.get(type(self))
+        if tensor_function is not None and _is_cuda_tensor(imgs):
+            return self._apply_with_memory(partial(tensor_function, self), imgs, **params)
+        return self._apply_with_memory(self.apply_to_images, imgs, **params)
+
+    def apply_to_images(self, imgs, **params):
+        return np.stack([self.apply(img, **params) for img in imgs])
 
 
 class NoOp(DualTransform):
-    """Does nothing"""
+    """Does nothing
+
+    The targets are returned as they are without sampling parameters, unless `track_history` is enabled.
+    Subclasses go through the usual `__call__` because they may override the methods that apply the transform.
+    """
+
+    def __call__(self, force_apply=False, **kwargs):
+        if type(self) is NoOp and not self.track_history:
+            return kwargs
+        return super(NoOp, self).__call__(force_apply, **kwargs)
 
     def apply_to_keypoint(self, keypoint, **params):
         return keypoint
@@ -245,3 +558,6 @@ class NoOp(DualTransform):
 
     def apply_to_mask(self, img, **params):
         return img
+
+    def apply_to_images(self, imgs, **params):
+        return imgs
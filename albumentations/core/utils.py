@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from abc import ABCMeta, abstractmethod
 
 from ..core.six import string_types, add_metaclass
+from ..core.lists_core import TransformsList
 
 
 def format_args(args_dict):
@@ -50,20 +51,33 @@ class DataProcessor:
 
     def postprocess(self, data):
         rows, cols = data['image'].shape[:2]
+        memories = self.get_memories(data)
 
         for data_name in self.data_fields:
             data[data_name] = self.filter(data[data_name], rows, cols)
             data[data_name] = self.check_and_convert(data[data_name], rows, cols, direction='from')
 
         data = self.remove_label_fields_from_data(data)
+        self.restore_memories(data, memories)
         return data
 
     def preprocess(self, data):
+        memories = self.get_memories(data)
         data = self.add_label_fields_to_data(data)
 
         rows, cols = data['image'].shape[:2]
         for data_name in self.data_fields:
             data[data_name] = self.check_and_convert(data[data_name], rows, cols, direction='to')
+        self.restore_memories(data, memories)
+
+    def get_memories(self, data):
+        """Collect the transform histories of the data fields, which are rebuilt as plain lists while processing."""
+        return {data_name: getattr(data[data_name], 'transforms', None) for data_name in self.data_fields}
+
+    def restore_memories(self, data, memories):
+        for data_name, memory in memories.items():
+            if memory is not None:
+                data[data_name] = TransformsList(data[data_name], memory)
 
     def check_and_convert(self, data, rows, cols, direction='to'):
         if self.params.format == 'albumentations':
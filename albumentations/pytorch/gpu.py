@@ -0,0 +1,127 @@
+"""GPU implementations of image-only transforms for CUDA tensors. Requires torch and kornia.
+
+Importing this module registers the supported transforms in `TENSOR_APPLY_REGISTRY`. `ImageOnlyTransform` uses
+them for `torch.Tensor` images on a CUDA device, see `ImageOnlyTransform` for the expected layout. Only the exact
+classes below are registered, their subclasses keep the CPU implementation.
+"""
+from __future__ import absolute_import, division
+
+from functools import wraps
+
+import cv2
+import torch
+import kornia
+
+from ..augmentations.transforms import RandomBrightnessContrast, InvertImg, Normalize, RandomGamma, Blur, \
+    GaussianBlur
+from ..core.transforms_interface import TENSOR_APPLY_REGISTRY
+
+__all__ = ['brightness_contrast_adjust', 'invert', 'normalize', 'gamma_transform', 'blur', 'gaussian_blur']
+
+
+def _max_value(img):
+    return 255 if img.dtype == torch.uint8 else 1.0
+
+
+def batched(func):
+    """Add the batch dimension that kornia filters expect to an image with shape (C, H, W)."""
+    @wraps(func)
+    def wrapped_function(img, *args, **kwargs):
+        if img.dim() == 3:
+            return func(img.unsqueeze(0), *args, **kwargs).squeeze(0)
+        return func(img, *args, **kwargs)
+
+    return wrapped_function
+
+
+def on_float(func):
+    """Run `func` on a float copy of an uint8 image and round the result back to uint8."""
+    @wraps(func)
+    def wrapped_function(img, *args, **kwargs):
+        if img.dtype == torch.uint8:
+            return func(img.float(), *args, **kwargs).round().clamp(0, 255).to(torch.uint8)
+        return func(img, *args, **kwargs)
+
+    return wrapped_function
+
+
+def brightness_contrast_adjust(img, alpha=1, beta=0):
+    max_value = _max_value(img)
+    dtype = img.dtype
+    result = img.float()
+    if alpha != 1:
+        result = result * alpha
+    if beta != 0:
+        # uint8 images are shifted by the mean of the source image, like the lookup table in the numpy version
+        means = (img.float() if dtype == torch.uint8 else result).mean(dim=(-3, -2, -1), keepdim=True)
+        result = result + beta * means
+    return result.clamp(0, max_value).to(dtype)
+
+
+def invert(img):
+    return 255 - img
+
+
+def normalize(img, mean, std, max_pixel_value=255.0):
+    mean = torch.tensor(mean, dtype=torch.float32, device=img.device).view(-1, 1, 1) * max_pixel_value
+    std = torch.tensor(std, dtype=torch.float32, device=img.device).view(-1, 1, 1) * max_pixel_value
+    return (img.float() - mean) / std
+
+
+def gamma_transform(img, gamma):
+    if img.dtype == torch.uint8:
+        return ((img.float() / 255.0) ** (1.0 / gamma) * 255).to(torch.uint8)
+    return img ** gamma
+
+
+@on_float
+@batched
+def blur(img, ksize):
+    return kornia.filters.box_blur(img, (ksize, ksize), border_type='reflect')
+
+
+@on_float
+@batched
+def gaussian_blur(img, ksize):
+    # cv2.GaussianBlur with sigma=0 uses fixed kernels for small sizes instead of a sigma derived from ksize,
+    # so the kernel is taken from cv2 itself
+    kernel = torch.tensor(cv2.getGaussianKernel(ksize, 0).ravel(), dtype=img.dtype, device=img.device)[None]
+    return kornia.filters.filter2d_separable(img, kernel, kernel, border_type='reflect')
+
+
+def _register(transform_cls):
+    def decorator(func):
+        TENSOR_APPLY_REGISTRY[transform_cls] = func
+        return func
+
+    return decorator
+
+
+@_register(RandomBrightnessContrast)
+def _brightness_contrast_to_tensor(transform, img, alpha=1., beta=0., **params):
+    return brightness_contrast_adjust(img, alpha, beta)
+
+
+@_register(InvertImg)
+def _invert_to_tensor(transform, img, **params):
+    return invert(img)
+
+
+@_register(Normalize)
+def _normalize_to_tensor(transform, img, **params):
+    return normalize(img, transform.mean, transform.std, transform.max_pixel_value)
+
+
+@_register(RandomGamma)
+def _gamma_to_tensor(transform, img, gamma=1, **params):
+    return gamma_transform(img, gamma)
+
+
+@_register(Blur)
+def _blur_to_tensor(transform, img, ksize=3, **params):
+    return blur(img, ksize)
+
+
+@_register(GaussianBlur)
+def _gaussian_blur_to_tensor(transform, img, ksize=3, **params):
+    return gaussian_blur(img, ksize)
@@ -36,7 +36,7 @@ setup(
     url='https://github.com/albu/albumentations',
     packages=find_packages(exclude=['tests']),
     install_requires=['numpy>=1.11.1', 'scipy', 'opencv-python-headless', 'imgaug>=0.2.5,<0.2.7', 'PyYAML'],
-    extras_require={'tests': get_test_requirements()},
+    extras_require={'tests': get_test_requirements(), 'gpu': ['torch', 'kornia']},
     classifiers=[
         'Development Status :: 4 - Beta',
         'License :: OSI Approved :: MIT License',
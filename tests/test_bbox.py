@@ -6,7 +6,8 @@ from albumentations.augmentations.bbox_utils import normalize_bbox, denormalize_
     convert_bbox_from_albumentations, convert_bboxes_to_albumentations, convert_bboxes_from_albumentations
 from albumentations.core.composition import Compose
 from albumentations.core.transforms_interface import NoOp
-from albumentations.augmentations.transforms import RandomSizedCrop, Rotate, RandomRotate90
+from albumentations.augmentations.transforms import RandomSizedCrop, Rotate, RandomRotate90, VerticalFlip, \
+    HorizontalFlip, Flip, Transpose, ShiftScaleRotate, CenterCrop, RandomCrop, Resize
 
 
 @pytest.mark.parametrize(['bbox', 'expected'], [
@@ -190,3 +191,65 @@ def test_random_rotate():
     aug = Rotate(limit=15, p=1.)
     transformed = aug(image=image, bboxes=bboxes)
     assert len(bboxes) == len(transformed['bboxes'])
+
+
+@pytest.mark.parametrize(['aug', 'params'], [
+    [VerticalFlip(), {}],
+    [HorizontalFlip(), {}],
+    [Flip(), {'d': -1}],
+    [Transpose(), {}],
+    [RandomRotate90(), {'factor': 3}],
+    [Rotate(), {'angle': 30, 'interpolation': 1}],
+    [ShiftScaleRotate(), {'angle': 30, 'scale': 1.2, 'dx': 0.1, 'dy': -0.05}],
+    [CenterCrop(50, 60), {}],
+    [RandomCrop(50, 60), {'h_start': 0.3, 'w_start': 0.6}],
+    [RandomSizedCrop((50, 80), 50, 50), {'crop_height': 60, 'crop_width': 70, 'h_start': 0.3, 'w_start': 0.6}],
+])
+def test_apply_to_bboxes_batch_matches_apply_to_bbox(aug, params):
+    params = dict(params, rows=100, cols=200)
+    # Short lists go through apply_to_bbox, long ones through the batch function
+    for repeats in (1, 11):
+        bboxes = [[0.1, 0.2, 0.6, 0.5, 'label'], [0.3, 0.4, 0.7, 0.9], [0.05, 0.1, 0.15, 0.3, 7, 'tag']] * repeats
+        expected = [list(aug.apply_to_bbox(bbox[:4], **params)) + bbox[4:] for bbox in bboxes]
+        transformed = aug.apply_to_bboxes(bboxes, **params)
+        assert len(transformed) == len(expected)
+        for bbox, expected_bbox in zip(transformed, expected):
+            np.testing.assert_allclose(bbox[:4], expected_bbox[:4])
+            assert bbox[4:] == expected_bbox[4:]
+
+    array_bboxes = np.array([[0.1, 0.2, 0.6, 0.5, 1], [0.3, 0.4, 0.7, 0.9, 2]])
+    transformed = aug.apply_to_bboxes(array_bboxes, **params)
+    assert isinstance(transformed, np.ndarray)
+    np.testing.assert_allclose(transformed[:, :4], [aug.apply_to_bbox(bbox[:4], **params) for bbox in array_bboxes])
+    np.testing.assert_array_equal(transformed[:, 4], [1, 2])
+
+
+def test_apply_to_bboxes_uses_overridden_apply_to_bbox():
+    class ShiftedHorizontalFlip(HorizontalFlip):
+        def apply_to_bbox(self, bbox, **params):
+            return [coord + 0.1 for coord in super(ShiftedHorizontalFlip, self).apply_to_bbox(bbox, **params)]
+
+    class BatchedShiftedHorizontalFlip(ShiftedHorizontalFlip):
+        def apply_to_bboxes_batch(self, bboxes, **params):
+            return super(BatchedShiftedHorizontalFlip, self).apply_to_bboxes_batch(bboxes, **params) + 0.1
+
+    bboxes = [[0.1, 0.2, 0.6, 0.5, 'label']] * 32
+    expected = [[0.5, 0.3, 1.0, 0.6, 'label']]
+    for aug in [ShiftedHorizontalFlip(), BatchedShiftedHorizontalFlip()]:
+        transformed = aug.apply_to_bboxes(bboxes, rows=100, cols=200)
+        np.testing.assert_allclose(transformed[0][:4], expected[0][:4])
+        assert transformed[0][4:] == ['label']
+
+
+@pytest.mark.parametrize('aug', [HorizontalFlip(), Resize(50, 60)])
+def test_apply_to_bboxes_keeps_the_input_container(aug):
+    bboxes = [[0.1, 0.2, 0.6, 0.5, 1], [0.3, 0.4, 0.7, 0.9, 2]]
+    expected = aug.apply_to_bboxes(bboxes, rows=100, cols=200)
+    assert isinstance(expected, list)
+
+    transformed = aug.apply_to_bboxes(np.array(bboxes), rows=100, cols=200)
+    assert isinstance(transformed, np.ndarray)
+    np.testing.assert_allclose(transformed, expected)
+
+    transformed = aug.apply_to_bboxes((bbox for bbox in bboxes), rows=100, cols=200)
+    assert transformed == expected
@@ -1,13 +1,18 @@
 from __future__ import absolute_import
 
+import random
+
 import cv2
 import numpy as np
 import pytest
 
-from albumentations.core.transforms_interface import to_tuple, ImageOnlyTransform, DualTransform
+from albumentations.core.transforms_interface import to_tuple, ImageOnlyTransform, DualTransform, HistoryEntry, NoOp, \
+    TENSOR_APPLY_REGISTRY
+from albumentations.core.numpy_core import TransformsArray
+from albumentations.core.lists_core import TransformsList
 from albumentations.augmentations.bbox_utils import check_bboxes
 from albumentations.core.composition import OneOrOther, Compose, OneOf, PerChannel
-from albumentations.augmentations.transforms import HorizontalFlip, Rotate, Blur, MedianBlur
+from albumentations.augmentations.transforms import HorizontalFlip, Rotate, Blur, MedianBlur, ShiftScaleRotate
 from .compat import mock, MagicMock, Mock, call
 
 
@@ -69,6 +74,8 @@ def test_to_tuple():
     assert to_tuple(100, low=30) == (30, 100)
     assert to_tuple(10, bias=1) == (-9, 11)
     assert to_tuple(100, bias=2) == (-98, 102)
+    assert to_tuple((0.9, 1.1), bias=-1.0) == (0.9 - 1.0, 1.1 - 1.0)
+    assert to_tuple([1, 2, 3], bias=1) == (2, 3, 4)
 
 
 def test_image_only_transform(image, mask):
@@ -81,6 +88,37 @@ def test_image_only_transform(image, mask):
             assert np.array_equal(data['mask'], mask)
 
 
+def test_image_only_transform_dispatches_cuda_tensors(image):
+    class SubclassTransform(ImageOnlyTransform):
+        pass
+
+    cuda_tensor = MagicMock(is_cuda=True, shape=(3, 60, 80))
+    cuda_batch = MagicMock(is_cuda=True, shape=(2, 3, 60, 80))
+    cuda_batch.__getitem__.return_value = cuda_tensor
+    tensor_function = Mock()
+    with mock.patch.object(ImageOnlyTransform, 'apply') as mocked_apply:
+        with mock.patch.dict(TENSOR_APPLY_REGISTRY, {ImageOnlyTransform: tensor_function}):
+            aug = ImageOnlyTransform(p=1)
+            aug(image=cuda_tensor)
+            tensor_function.assert_called_once_with(aug, cuda_tensor, cols=80, rows=60)
+            aug(images=cuda_batch)
+            assert tensor_function.call_count == 2
+            aug(image=image)
+            mocked_apply.assert_called_once_with(image, cols=image.shape[1], rows=image.shape[0])
+
+            # Subclasses don't inherit the tensor function of their parent
+            SubclassTransform(p=1)(image=cuda_tensor)
+            assert tensor_function.call_count == 2
+            assert mocked_apply.call_count == 2
+
+
+def test_unregistered_transforms_dont_probe_for_cuda_tensors(image):
+    with mock.patch('albumentations.core.transforms_interface._is_cuda_tensor') as mocked_is_cuda_tensor:
+        Blur(p=1)(image=image)
+        Blur(p=1)(images=np.stack([image, image]))
+    assert not mocked_is_cuda_tensor.called
+
+
 def test_dual_transform(image, mask):
     image_call = call(image, interpolation=cv2.INTER_LINEAR, cols=image.shape[1], rows=image.shape[0])
     mask_call = call(mask, interpolation=cv2.INTER_NEAREST, cols=mask.shape[1], rows=mask.shape[0])
@@ -144,3 +182,252 @@ def test_per_channel_multi():
     image = np.ones((8, 8, 5))
     data = augmentation(image=image)
     assert data
+
+
+def test_keep_memory():
+    aug = HorizontalFlip(p=1)
+    aug.track_history = True
+    bboxes = TransformsList([[0.1, 0.2, 0.3, 0.4, 1]])
+    aug.keep_memory(bboxes, rows=8, cols=8)
+    assert bboxes.transforms == [HistoryEntry(aug, {'rows': 8, 'cols': 8})]
+
+    image = TransformsArray(np.ones((8, 8)))
+    aug.keep_memory(image)
+    aug.keep_memory(image)
+    assert len(image.transforms) == 2
+
+    # Plain arrays, lists and tuples can't store the history, it is attached to the transformed target instead
+    for target, wrapper in [(np.ones((8, 8)), TransformsArray), ([[0.1, 0.2, 0.3, 0.4]], TransformsList),
+                            (((0.1, 0.2, 0.3, 0.4),), TransformsList)]:
+        memory = aug.keep_memory(target, rows=8, cols=8)
+        assert memory == [HistoryEntry(aug, {'rows': 8, 'cols': 8})]
+        assert not hasattr(target, 'transforms')
+        result = aug._apply_with_memory(lambda x, **params: x, target, rows=8, cols=8)
+        assert isinstance(result, wrapper)
+        assert len(result.transforms) == 1
+
+    aug.track_history = False
+    assert aug.keep_memory(bboxes) is None
+    assert len(bboxes.transforms) == 1
+
+
+def test_target_dependence():
+    class MaskDependentTransform(DualTransform):
+        @property
+        def target_dependence(self):
+            return {'image': ['mask']}
+
+        def apply(self, img, mask=None, **params):
+            return img + mask
+
+        def apply_to_mask(self, img, **params):
+            assert 'mask' not in params
+            return img
+
+    image = np.ones((8, 8))
+    mask = np.full((8, 8), 2)
+    data = MaskDependentTransform(p=1)(image=image, mask=mask)
+    assert np.array_equal(data['image'], np.full((8, 8), 3))
+    assert np.array_equal(data['mask'], mask)
+    assert MaskDependentTransform._uses_target_dependence
+    assert not MaskDependentTransform._uses_targets_as_params
+    assert not DualTransform._uses_target_dependence
+
+
+def test_target_function_cache_is_reset_by_add_targets():
+    aug = HorizontalFlip(p=1)
+    image = np.arange(16).reshape(4, 4)
+    data = aug(image=image, image2=image)
+    assert np.array_equal(data['image2'], image)
+
+    aug.add_targets({'image2': 'image'})
+    data = aug(image=image, image2=image)
+    assert np.array_equal(data['image2'], data['image'])
+
+
+def test_targets_are_resolved_once_per_key(image, mask):
+    aug = HorizontalFlip(p=1)
+    with mock.patch.object(HorizontalFlip, 'targets', new_callable=mock.PropertyMock) as mocked_targets:
+        mocked_targets.return_value = {'image': aug._apply, 'mask': aug._apply_to_mask}
+        for _ in range(3):
+            data = aug(image=image, mask=mask)
+    assert mocked_targets.call_count == 2
+    assert np.array_equal(data['mask'], mask[:, ::-1])
+
+
+def test_noop_returns_targets_without_sampling(image, mask):
+    aug = NoOp(p=0.5)
+    with mock.patch('random.random') as mocked_random:
+        data = aug(image=image, mask=mask)
+    assert not mocked_random.called
+    assert data['image'] is image
+    assert data['mask'] is mask
+
+    aug.track_history = True
+    data = aug(image=TransformsArray(image), force_apply=True)
+    assert [entry.transform for entry in data['image'].transforms] == [aug]
+
+
+def test_noop_subclass_applies_its_methods(image):
+    class Invert(NoOp):
+        def apply(self, img, **params):
+            return 255 - img
+
+    data = Invert(p=1)(image=image)
+    assert np.array_equal(data['image'], 255 - image)
+
+
+def test_untracked_transforms_skip_keep_memory(image, mask):
+    aug = Compose([HorizontalFlip(p=1), Blur(p=1)])
+    with mock.patch.object(DualTransform, 'keep_memory') as mocked_dual, \
+            mock.patch.object(ImageOnlyTransform, 'keep_memory') as mocked_image_only:
+        data = aug(image=image, mask=mask)
+    assert not mocked_dual.called
+    assert not mocked_image_only.called
+    assert type(data['image']) is np.ndarray
+
+
+def test_track_history():
+    aug = Compose([HorizontalFlip(p=1), OneOf([Rotate(p=1)], p=1), Blur(p=1)])
+    image = TransformsArray(np.ones((8, 8), dtype=np.uint8))
+    mask = TransformsArray(np.ones((8, 8)))
+    aug(image=image, mask=mask)
+    assert image.transforms == []
+
+    aug.track_history = True
+    assert aug.track_history
+    data = aug(image=image, mask=mask)
+    flip, rotate, blur = aug.transforms[0], aug.transforms[1].transforms[0], aug.transforms[2]
+    assert [entry.transform for entry in data['image'].transforms] == [flip, rotate, blur]
+    assert [entry.transform for entry in data['mask'].transforms] == [flip, rotate]
+    assert np.asarray(data['mask']).shape == (8, 8)
+
+
+def test_track_history_with_fused_affine_transforms():
+    aug = Compose([HorizontalFlip(p=1), Rotate(p=1), ShiftScaleRotate(p=1), Blur(p=1)], fuse_affine=True)
+    flip, rotate, shift_scale_rotate, blur = aug.transforms
+    aug.track_history = True
+    data = aug(image=np.ones((8, 8), dtype=np.uint8), mask=np.ones((8, 8)))
+    assert [entry.transform for entry in data['image'].transforms] == [flip, rotate, shift_scale_rotate, blur]
+    assert [entry.transform for entry in data['mask'].transforms] == [flip, rotate, shift_scale_rotate]
+    assert 'angle' in data['image'].transforms[1].params
+    assert 'scale' in data['image'].transforms[2].params
+
+    rotate.track_history = False
+    data = aug(image=np.ones((8, 8), dtype=np.uint8))
+    assert [entry.transform for entry in data['image'].transforms] == [flip, shift_scale_rotate, blur]
+
+
+def test_track_history_with_plain_targets():
+    aug = Compose([HorizontalFlip(p=1), Rotate(p=1), Blur(p=1)], bbox_params={'format': 'pascal_voc'},
+                  keypoint_params={'format': 'xy'})
+    aug.track_history = True
+    flip, rotate, blur = aug.transforms
+    data = aug(image=np.ones((100, 100, 3), dtype=np.uint8), mask=np.ones((100, 100)),
+               bboxes=[(10, 20, 40, 50, 1)], keypoints=((20, 30),))
+    assert isinstance(data['image'], TransformsArray)
+    assert [entry.transform for entry in data['image'].transforms] == [flip, rotate, blur]
+    assert [entry.transform for entry in data['mask'].transforms] == [flip, rotate]
+    assert isinstance(data['bboxes'], TransformsList)
+    assert [entry.transform for entry in data['bboxes'].transforms] == [flip, rotate]
+    assert [entry.transform for entry in data['keypoints'].transforms] == [flip, rotate]
+
+    data = HorizontalFlip(p=1)(image=np.ones((8, 8)), bboxes=[[0.1, 0.2, 0.3, 0.4]])
+    assert not hasattr(data['image'], 'transforms')
+    assert type(data['bboxes']) is list
+
+
+def test_transforms_array_targets(image, mask):
+    masks = TransformsArray(np.stack([mask, mask]))
+    data = HorizontalFlip(p=1)(image=image, masks=masks)
+    assert np.array_equal(data['masks'][1], mask[:, ::-1])
+
+    data = Compose([PerChannel([Blur(p=1)], p=1)])(image=TransformsArray(image.copy()))
+    assert data['image'].shape == image.shape
+
+    data = Blur(p=1)(images=TransformsArray(np.stack([image, image])))
+    assert data['images'].shape == (2,) + image.shape
+
+    data = Compose([HorizontalFlip(p=1), Blur(p=1)])(image=TransformsArray(image), mask=TransformsArray(mask))
+    assert isinstance(data['image'], TransformsArray)
+    assert np.array_equal(data['mask'][0], mask[0, ::-1])
+    assert np.array_equal(data['mask'] + 1, mask[:, ::-1] + 1)
+
+
+def test_probability_is_reproducible_with_random_seed():
+    aug = Compose([HorizontalFlip(p=0.5), Rotate(p=0.5), Blur(p=0.5)])
+    image = np.random.randint(low=0, high=256, size=(16, 16, 3), dtype=np.uint8)
+    results = []
+    for _ in range(2):
+        random.seed(42)
+        results.append([aug(image=image)['image'] for _ in range(10)])
+    for first, second in zip(*results):
+        assert np.array_equal(first, second)
+
+
+def test_compose_fuse_affine():
+    transforms = [ShiftScaleRotate(shift_limit=(0.1, 0.1), scale_limit=(0.2, 0.2), rotate_limit=(30, 30), p=1),
+                  ShiftScaleRotate(shift_limit=(-0.05, -0.05), scale_limit=(-0.1, -0.1), rotate_limit=(-15, -15), p=1)]
+    image = cv2.GaussianBlur(np.random.randint(low=0, high=256, size=(100, 100, 3), dtype=np.uint8), (31, 31), 0)
+    keypoints = [(20.0, 30.0, 0.5, 1.0), (60.0, 50.0, 0.0, 2.0)]
+
+    expected = Compose(transforms)(image=image, keypoints=keypoints)
+    fused = Compose(transforms, fuse_affine=True)
+    with mock.patch.object(ShiftScaleRotate, 'apply', side_effect=AssertionError):
+        data = fused(image=image, keypoints=keypoints)
+
+    assert data['image'].shape == image.shape
+    assert np.abs(data['image'].astype(np.float32) - expected['image']).mean() < 2
+    assert np.allclose(data['keypoints'], expected['keypoints'])
+    assert fused._to_dict()['fuse_affine']
+
+
+def test_compose_fuse_affine_keeps_the_random_sequence(image):
+    transforms = [Rotate(p=1), ShiftScaleRotate(p=1), Blur(p=0.5)]
+    next_draws = []
+    for fuse_affine in (False, True):
+        random.seed(0)
+        Compose(transforms, fuse_affine=fuse_affine)(image=image)
+        next_draws.append(random.random())
+    assert next_draws[0] == next_draws[1]
+
+
+def test_compose_fuse_affine_skips_overridden_subclasses(image):
+    class RotateAndInvert(Rotate):
+        def apply(self, img, **params):
+            return 255 - super(RotateAndInvert, self).apply(img, **params)
+
+    transforms = [Rotate(limit=(30, 30), p=1), RotateAndInvert(limit=(-30, -30), p=1)]
+    expected = Compose(transforms)(image=image)
+    data = Compose(transforms, fuse_affine=True)(image=image)
+    assert np.array_equal(data['image'], expected['image'])
+
+
+def test_compose_fuse_affine_with_array_border_values(image):
+    transforms = [Rotate(limit=(30, 30), border_mode=cv2.BORDER_CONSTANT, value=np.array([1., 2., 3.]), p=1),
+                  Rotate(limit=(-15, -15), border_mode=cv2.BORDER_CONSTANT, value=np.array([1., 2., 3.]), p=1),
+                  Rotate(limit=(10, 10), border_mode=cv2.BORDER_CONSTANT, value=np.array([4., 5., 6.]), p=1)]
+    with mock.patch.object(Rotate, 'apply', wraps=transforms[2].apply) as mocked_apply:
+        data = Compose(transforms, fuse_affine=True)(image=image)
+    assert mocked_apply.call_count == 1
+    assert data['image'].shape == image.shape
+
+
+def test_compose_fuse_affine_with_default_border_args(image):
+    class Shift(DualTransform):
+        is_affine = True
+
+        def get_params(self):
+            return {'dx': 0.1}
+
+        def apply(self, img, dx=0, **params):
+            return ShiftScaleRotate(p=1).apply(img, 0, 1, dx, 0)
+
+        def get_affine_matrix(self, params):
+            return np.array([[1, 0, params['dx'] * params['cols']], [0, 1, 0], [0, 0, 1]])
+
+    transforms = [Shift(p=1), Shift(p=1)]
+    expected = Compose(transforms)(image=image)
+    with mock.patch.object(Shift, 'apply', side_effect=AssertionError):
+        data = Compose(transforms, fuse_affine=True)(image=image)
+    assert np.array_equal(data['image'][:, 20:], expected['image'][:, 20:])
@@ -8,7 +8,8 @@ from albumentations.augmentations.keypoints_utils import convert_keypoint_from_a
     convert_keypoints_from_albumentations, convert_keypoint_to_albumentations, convert_keypoints_to_albumentations
 from albumentations.core.composition import Compose
 from albumentations.core.transforms_interface import NoOp
-from albumentations.augmentations.transforms import RandomSizedCrop
+from albumentations.augmentations.transforms import RandomSizedCrop, RandomRotate90, RandomScale, RandomCrop, Rotate, \
+    ShiftScaleRotate
 import albumentations.augmentations.functional as F
 
 
@@ -250,3 +251,29 @@ def test_compose_with_additional_targets():
     transformed = aug(image=image, keypoints=keypoints, kp1=kp1)
     assert transformed['keypoints'] == [[25, 25]]
     assert transformed['kp1'] == [[30, 30]]
+
+
+@pytest.mark.parametrize(['aug', 'params'], [
+    [VerticalFlip(), {}],
+    [HorizontalFlip(), {}],
+    [Flip(), {'d': -1}],
+    [RandomRotate90(), {'factor': 1}],
+    [RandomScale(), {'scale': 1.5}],
+    [Rotate(), {'angle': 30}],
+    [ShiftScaleRotate(), {'angle': 30, 'scale': 1.2, 'dx': 0.1, 'dy': -0.05}],
+    [CenterCrop(50, 60), {}],
+    [RandomCrop(50, 60), {'h_start': 0.3, 'w_start': 0.6}],
+])
+def test_apply_to_keypoints_batch_matches_apply_to_keypoint(aug, params):
+    params = dict(params, rows=100, cols=200)
+    # Short lists go through apply_to_keypoint, long ones through the batch function
+    keypoints = [[20., 30., math.pi / 4, 2, 'label'], [50., 60., 0, 1], [70., 10., -math.pi / 3, 5, 1]] * 11
+    expected = [list(aug.apply_to_keypoint(kp[:4], **params)) + kp[4:] for kp in keypoints]
+    transformed = aug.apply_to_keypoints(keypoints, **params)
+    assert len(transformed) == len(expected)
+    for kp, expected_kp in zip(transformed, expected):
+        np.testing.assert_allclose(kp[:2] + kp[3:4], expected_kp[:2] + expected_kp[3:4], atol=1e-7)
+        # Angles are equal up to a full turn, pi and -pi describe the same direction
+        angle_difference = (kp[2] - expected_kp[2] + math.pi) % (2 * math.pi) - math.pi
+        assert abs(angle_difference) < 1e-7
+        assert kp[4:] == expected_kp[4:]
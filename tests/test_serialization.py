@@ -607,3 +607,9 @@ def test_lambda_serialization(image, mask, bboxes, keypoints, seed, p):
     assert np.array_equal(aug_data['mask'], deserialized_aug_data['mask'])
     assert np.array_equal(aug_data['bboxes'], deserialized_aug_data['bboxes'])
     assert np.array_equal(aug_data['keypoints'], deserialized_aug_data['keypoints'])
+
+
+def test_private_fused_affine_is_not_registered():
+    from albumentations.core.serialization import SERIALIZABLE_REGISTRY
+    assert 'albumentations.core.composition._FusedAffine' not in SERIALIZABLE_REGISTRY
+    assert 'albumentations.augmentations.transforms.Rotate' in SERIALIZABLE_REGISTRY
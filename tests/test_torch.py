@@ -1,7 +1,9 @@
 import numpy as np
+import pytest
 import torch
 
 import albumentations as A
+import albumentations.augmentations.functional as F
 from albumentations.pytorch.transforms import ToTensor
 
 
@@ -23,3 +25,34 @@ def test_additional_targets_for_totensor():
         res = aug(image=image1, image2=image2, mask=mask1, mask2=mask2)
         assert np.array_equal(res['image'], res['image2'])
         assert np.array_equal(res['mask'], res['mask2'])
+
+
+@pytest.mark.parametrize(['function_name', 'args'], [
+    ['brightness_contrast_adjust', (1.2, 0.1)],
+    ['invert', ()],
+    ['normalize', ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225))],
+    ['gamma_transform', (1.5,)],
+    ['blur', (5,)],
+    ['gaussian_blur', (5,)],
+])
+def test_gpu_functions_match_numpy(function_name, args, image):
+    gpu = pytest.importorskip('albumentations.pytorch.gpu')
+    tensor = torch.from_numpy(np.moveaxis(image, -1, 0).copy())
+    result = getattr(gpu, function_name)(tensor, *args).numpy()
+    expected = getattr(F, function_name)(image, *args)
+    assert np.abs(np.moveaxis(result, 0, -1).astype(np.float32) - expected).max() <= 1
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason='CUDA is not available')
+def test_gpu_dispatch_for_cuda_tensors(image):
+    pytest.importorskip('albumentations.pytorch.gpu')
+    tensor = torch.from_numpy(np.moveaxis(image, -1, 0).copy()).cuda()
+    aug = A.Compose([A.Normalize(p=1), A.Blur(blur_limit=(5, 5), p=1)])
+    result = aug(image=tensor)['image']
+    assert result.is_cuda
+    expected = aug(image=image)['image']
+    assert np.abs(np.moveaxis(result.cpu().numpy(), 0, -1) - expected).max() < 1e-4
+
+    result = aug(images=torch.stack([tensor, tensor]))['images']
+    assert result.is_cuda
+    assert result.shape == (2,) + tensor.shape
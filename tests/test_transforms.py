@@ -293,3 +293,87 @@ def test_channel_droput():
     transformed = aug(image=img)['image']
 
     assert sum([transformed[:, :, c].max() for c in range(img.shape[2])]) == 1
+
+
+@pytest.mark.parametrize(['augmentation_cls', 'params', 'dtype'], [
+    [A.RandomBrightnessContrast, {'alpha': 1.3, 'beta': 0.2}, np.uint8],
+    [A.RandomBrightnessContrast, {'alpha': 1.3, 'beta': 0.2}, np.float32],
+    [A.RandomBrightnessContrast, {'alpha': 0.7, 'beta': -0.3}, np.uint8],
+    [A.RandomBrightnessContrast, {'alpha': 0.7, 'beta': -0.3}, np.float32],
+    [A.Normalize, {}, np.uint8],
+    [A.Normalize, {}, np.float32],
+    [A.InvertImg, {}, np.uint8],
+    [A.ToFloat, {}, np.uint8],
+    [A.ToFloat, {}, np.float32],
+    [A.Blur, {'ksize': 5}, np.uint8],
+    [A.Blur, {'ksize': 5}, np.float32],
+])
+def test_apply_to_images_matches_apply(augmentation_cls, params, dtype):
+    images = np.random.randint(low=0, high=256, size=(4, 20, 30, 3)).astype(dtype)
+    if dtype == np.float32:
+        images /= 255
+    aug = augmentation_cls(p=1)
+    expected = np.stack([aug.apply(image, **params) for image in images])
+    transformed = aug.apply_to_images(images, **params)
+    assert transformed.dtype == expected.dtype
+    np.testing.assert_allclose(transformed, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_images_target():
+    images = np.random.randint(low=0, high=256, size=(4, 20, 30, 3), dtype=np.uint8)
+    aug = A.Compose([A.Blur(p=1), A.RandomBrightnessContrast(p=1)])
+    transformed = aug(images=images)['images']
+    assert transformed.shape == images.shape
+
+
+@pytest.mark.parametrize('augmentation_cls', [A.Cutout, A.CoarseDropout, A.RandomRain, A.RandomFog,
+                                              A.RandomSunFlare, A.RandomShadow])
+def test_images_target_with_params_dependent_on_image(augmentation_cls):
+    images = np.random.randint(low=0, high=256, size=(4, 100, 80, 3), dtype=np.uint8)
+    transformed = augmentation_cls(p=1)(images=images)['images']
+    assert transformed.shape == images.shape
+
+
+def test_images_target_is_rejected_by_dual_transforms():
+    images = np.random.randint(low=0, high=256, size=(4, 100, 80, 3), dtype=np.uint8)
+    with pytest.raises(NotImplementedError):
+        A.Compose([A.RandomCrop(32, 32), A.Normalize()])(images=images)
+
+
+@pytest.mark.parametrize('augmentation_cls', [A.Blur, A.Cutout])
+def test_images_target_as_list(augmentation_cls):
+    images = np.random.randint(low=0, high=256, size=(2, 100, 80, 3), dtype=np.uint8)
+    transformed = augmentation_cls(p=1)(images=list(images))['images']
+    assert transformed.shape == images.shape
+
+
+def test_images_target_passes_through_noop():
+    images = np.random.randint(low=0, high=256, size=(2, 100, 80, 3), dtype=np.uint8)
+    aug = A.Compose([A.NoOp(p=1), A.Blur(p=1)])
+    aug.track_history = True
+    transformed = aug(images=images)['images']
+    assert transformed.shape == images.shape
+    assert [entry.transform for entry in transformed.transforms] == list(aug.transforms)
+
+
+def test_images_target_with_lambda():
+    images = np.random.randint(low=0, high=256, size=(2, 100, 80, 3), dtype=np.uint8)
+
+    def negate_image(image, **kwargs):
+        return 255 - image
+
+    transformed = A.Lambda(image=negate_image)(images=images)['images']
+    assert np.array_equal(transformed, 255 - images)
+
+
+@pytest.mark.parametrize('masks_as_array', [True, False])
+def test_masks_target(masks_as_array):
+    image = np.ones((100, 80, 3), dtype=np.uint8)
+    masks = np.random.randint(low=0, high=2, size=(5, 100, 80), dtype=np.uint8)
+    aug = A.Compose([A.RandomCrop(50, 40, p=1), A.Transpose(p=1)])
+    data = aug(image=image, masks=masks if masks_as_array else list(masks))
+    assert isinstance(data['masks'], np.ndarray) == masks_as_array
+    assert len(data['masks']) == 5
+    for mask in data['masks']:
+        assert mask.shape == (40, 50)
+        assert mask.dtype == np.uint8